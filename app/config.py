@@ -15,6 +15,11 @@ class Settings(BaseSettings):
     # Auth
     API_KEYS: List[str] = ["dev-secret-key"]  # replace in prod
 
+    # Admin diagnostics (/v1/admin/*); disabled unless explicitly enabled
+    ADMIN_ENABLED: bool = False
+    ADMIN_API_KEYS: List[str] = []
+    ADMIN_PROFILE_MAX_S: float = 60.0
+
     # Provider
     GPT_PROVIDER: str = "echo"  # echo|openai|local
     OPENAI_API_KEY: Optional[str] = None
@@ -24,10 +29,44 @@ class Settings(BaseSettings):
     OPENAI_ASSISTANT_ID: Optional[str] = None
     OPENAI_VECTOR_STORE_ID: Optional[str] = None
 
+    # Pre-warmed Assistants threads (assistant mode only)
+    THREAD_POOL_ENABLED: bool = True
+    THREAD_POOL_MIN_SIZE: int = 2
+    THREAD_POOL_MAX_SIZE: int = 20
+    THREAD_POOL_RATE_WINDOW_S: float = 60.0  # pool target = new sessions seen in this window
+    THREAD_POOL_IDLE_TTL_S: float = 3600.0  # delete session threads idle longer than this
+
     # Cache (optional)
     REDIS_URL: Optional[str] = None
     REQUEST_TIMEOUT_S: float = 30.0
 
+    # Near-duplicate reuse (MinHash/LSH over reviewed texts)
+    NEAR_DUP_ENABLED: bool = True
+    NEAR_DUP_THRESHOLD: float = 0.85  # estimated Jaccard similarity required to reuse a review
+    NEAR_DUP_NUM_PERM: int = 128
+    NEAR_DUP_BANDS: int = 32
+    NEAR_DUP_MAX_ENTRIES: int = 5000
+    NEAR_DUP_MIN_CHARS: int = 200  # shorter texts (chit-chat) always go to the model
+    NEAR_DUP_MAX_CHARS: int = 20000  # longer texts skip the index (MinHash cost grows with length)
+    NEAR_DUP_TTL_S: int = 86400  # Redis persistence TTL (only when REDIS_URL is set)
+
+    # Session uploads (in memory, per API key)
+    UPLOAD_MAX_SESSIONS: int = 500
+    UPLOAD_MAX_TOTAL_CHARS: int = 50_000_000
+    UPLOAD_TTL_S: float = 3600.0
+
+    # Incremental (paragraph-level) re-review
+    PARAGRAPH_STORE_MAX_ENTRIES: int = 20000
+    PARAGRAPH_TTL_S: int = 86400
+    PARAGRAPH_CONCURRENCY: int = 4  # max paragraphs reviewed in parallel per request
+
+    # WebSocket chat
+    WS_HEARTBEAT_S: float = 20.0
+    WS_IDLE_TIMEOUT_S: float = 300.0  # close sockets with no client traffic and nothing in flight
+    WS_MAX_INFLIGHT: int = 8  # concurrent requests per connection
+    WS_AUTH_TIMEOUT_S: float = 10.0  # time allowed for the first {"type": "auth"} frame
+    WS_MAX_SEED_TURNS: int = 50  # history a reconnecting client may replay in its auth frame
+
     # Config
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -35,7 +74,7 @@ class Settings(BaseSettings):
         extra="ignore",  # ignore unknown env vars instead of erroring
     )
 
-    @field_validator("ALLOW_ORIGINS", "API_KEYS", mode="before")
+    @field_validator("ALLOW_ORIGINS", "API_KEYS", "ADMIN_API_KEYS", mode="before")
     @classmethod
     def _parse_json_list(cls, v):
         if isinstance(v, str):
@@ -3,32 +3,79 @@
 Dependency wiring for the FastAPI app.
 
 - require_api_key: enforces X-API-Key header
+- require_admin_key: enforces X-Admin-Key header (404 unless ADMIN_ENABLED)
 - get_request_context: per-request metadata (request_id, start time)
 - get_gpt_client: returns an OpenAI client; prefers Assistants API when OPENAI_ASSISTANT_ID is set
 - get_cache: shared cache handle (noop if REDIS_URL is empty)
+- get_near_dup_index: shared near-duplicate reuse index (None if NEAR_DUP_ENABLED is false)
+- get_paragraph_store: shared per-paragraph findings store (incremental re-review)
+- get_thread_pool: shared pre-warmed Assistants thread pool (None outside assistant mode)
 """
 
 import time
 import uuid
 import logging
+from typing import Optional
 from fastapi import Depends
+from openai import OpenAI
 
-from .utils.auth import api_key_auth
+from .utils.auth import api_key_auth, admin_key_auth
 from .config import settings
 from .services.cache import Cache
+from .services.near_dup import NearDupIndex
+from .services.paragraphs import ParagraphStore
 from .services.gpt_service import EchoClient, OpenAIClient, GPTClient
+from .services.thread_pool import AssistantThreadPool
 
 log = logging.getLogger("app.deps")
 
 # Single cache instance (safe for local/dev; swap for managed Redis in prod)
 _cache = Cache(settings.REDIS_URL)
 
+# Single near-duplicate index per process (mirrored to Redis when available)
+_near_dup = NearDupIndex(
+    threshold=settings.NEAR_DUP_THRESHOLD,
+    num_perm=settings.NEAR_DUP_NUM_PERM,
+    bands=settings.NEAR_DUP_BANDS,
+    max_entries=settings.NEAR_DUP_MAX_ENTRIES,
+    cache=_cache,
+    ttl=settings.NEAR_DUP_TTL_S,
+) if settings.NEAR_DUP_ENABLED else None
+
+# Per-paragraph findings, shared across sessions so unchanged paragraphs are never re-sent
+_paragraphs = ParagraphStore(
+    max_entries=settings.PARAGRAPH_STORE_MAX_ENTRIES,
+    cache=_cache,
+    ttl=settings.PARAGRAPH_TTL_S,
+)
+
+# One thread pool per process, shared by every OpenAIClient (clients are built per request)
+_thread_pool: Optional[AssistantThreadPool] = None
+if (
+    settings.THREAD_POOL_ENABLED
+    and settings.GPT_PROVIDER == "openai"
+    and settings.OPENAI_API_KEY
+    and settings.OPENAI_ASSISTANT_ID
+):
+    _thread_pool = AssistantThreadPool(
+        OpenAI(api_key=settings.OPENAI_API_KEY),
+        min_size=settings.THREAD_POOL_MIN_SIZE,
+        max_size=settings.THREAD_POOL_MAX_SIZE,
+        idle_ttl_s=settings.THREAD_POOL_IDLE_TTL_S,
+        rate_window_s=settings.THREAD_POOL_RATE_WINDOW_S,
+    )
+
 
 async def require_api_key(api_key: str = Depends(api_key_auth)) -> str:
     """Enforce API key on protected routes."""
     return api_key
 
 
+async def require_admin_key(api_key: str = Depends(admin_key_auth)) -> str:
+    """Enforce admin API key on diagnostics routes."""
+    return api_key
+
+
 def get_request_context() -> dict:
     """Attach a request id and start time for logging/metrics."""
     return {"request_id": str(uuid.uuid4()), "start": time.perf_counter()}
@@ -47,6 +94,7 @@ def get_gpt_client() -> GPTClient:
             api_key=settings.OPENAI_API_KEY,
             model=settings.OPENAI_MODEL,
             assistant_id=settings.OPENAI_ASSISTANT_ID,  # <<< ensures Assistant is used when present
+            thread_pool=_thread_pool,
         )
         mode = "assistant" if settings.OPENAI_ASSISTANT_ID else "chat"
         log.info("get_gpt_client -> OpenAIClient mode=%s model=%s", mode, settings.OPENAI_MODEL)
@@ -59,3 +107,18 @@ def get_gpt_client() -> GPTClient:
 def get_cache() -> Cache:
     """Return the process-wide cache instance (noop if REDIS_URL unset)."""
     return _cache
+
+
+def get_near_dup_index() -> Optional[NearDupIndex]:
+    """Return the process-wide near-duplicate index (None when disabled)."""
+    return _near_dup
+
+
+def get_paragraph_store() -> ParagraphStore:
+    """Return the process-wide paragraph results store."""
+    return _paragraphs
+
+
+def get_thread_pool() -> Optional[AssistantThreadPool]:
+    """Return the process-wide Assistants thread pool (None unless assistant mode)."""
+    return _thread_pool
@@ -1,18 +1,38 @@
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from .config import settings
+from .deps import get_thread_pool
 from .utils.logging import setup_logging
 from .routes.v1 import generate as gen_v1
 from .routes.v1 import health as health_v1
 from .routes.v1 import docs as docs_v1
+from .routes.v1 import ws as ws_v1
+from .routes.v1 import admin as admin_v1
+from .services import diagnostics
 
 
 setup_logging(settings.LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title=settings.APP_NAME, version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    pool = get_thread_pool()
+    if pool:
+        pool.start()  # begin pre-warming before the first session arrives
+    if settings.ADMIN_ENABLED:
+        diagnostics.loop_lag.start()
+    yield
+    diagnostics.loop_lag.stop()
+    if pool:
+        await asyncio.to_thread(pool.close)  # delete pre-warmed and session threads
+
+
+app = FastAPI(title=settings.APP_NAME, version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -27,9 +47,29 @@ async def add_request_id(request: Request, call_next):
     import uuid, time
     request_id = str(uuid.uuid4())
     start = time.perf_counter()
-    response = await call_next(request)
+    sampler = None
+    # Debug profile: X-Debug-Profile plus an admin key in X-Admin-Key (X-API-Key is left to the
+    # route). Samples the event-loop and executor threads only, so concurrent requests served by
+    # those threads appear too; the profile is not isolated to this request.
+    if (
+        settings.ADMIN_ENABLED
+        and request.headers.get("x-debug-profile")
+        and request.headers.get("x-admin-key") in settings.ADMIN_API_KEYS
+    ):
+        sampler = diagnostics.StackSampler(
+            interval_s=0.001,
+            threads=diagnostics.loop_and_executor_threads(asyncio.get_running_loop()),
+        ).start()
+    try:
+        response = await call_next(request)
+    finally:
+        if sampler:
+            await asyncio.to_thread(sampler.stop)  # joins the sampler thread
+            diagnostics.store_request_profile(request_id, sampler.to_speedscope(name=request.url.path))
     latency = int((time.perf_counter() - start) * 1000)
     response.headers["X-Request-ID"] = request_id
+    if sampler:
+        response.headers["X-Profile-ID"] = request_id
     logger.info(f"request_complete path={request.url.path} status={response.status_code} latency_ms={latency} request_id={request_id}")
     return response
 
@@ -41,6 +81,8 @@ async def global_exception_handler(request: Request, exc: Exception):
 app.include_router(health_v1.router, prefix="/v1", tags=["health"])
 app.include_router(gen_v1.router, prefix="/v1", tags=["generate"])
 app.include_router(docs_v1.router, prefix="/v1/docs", tags=["docs"])
+app.include_router(ws_v1.router, prefix="/v1", tags=["ws"])
+app.include_router(admin_v1.router, prefix="/v1/admin", tags=["admin"])
 
 
 @app.get("/")
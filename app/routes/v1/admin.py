@@ -0,0 +1,101 @@
+# app/routes/v1/admin.py
+"""
+Admin diagnostics for a running worker (requires ADMIN_ENABLED and an ADMIN_API_KEYS key).
+
+- POST /v1/admin/profile/cpu            time-boxed sampling CPU profile (speedscope JSON or collapsed)
+- GET  /v1/admin/profile/requests/{id}  profile captured for a request sent with X-Debug-Profile: 1
+- POST /v1/admin/memory/start|stop      toggle tracemalloc
+- GET  /v1/admin/memory/snapshot        top allocations + diff vs previous snapshot + in-memory store sizes
+- GET  /v1/admin/runtime                event-loop lag, executor saturation, threads, gc
+"""
+from __future__ import annotations
+
+import asyncio
+import gc
+import threading
+import tracemalloc
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from ...config import settings
+from ...deps import require_admin_key, get_near_dup_index, get_paragraph_store, get_thread_pool
+from ...services import diagnostics
+from .docs import SESSION_UPLOADS
+
+router = APIRouter(dependencies=[Depends(require_admin_key)])
+
+_profile_lock = asyncio.Lock()  # one CPU profile at a time per worker
+
+
+@router.post("/profile/cpu")
+async def profile_cpu(
+    seconds: float = Query(10.0, gt=0),
+    interval_ms: float = Query(5.0, ge=1.0, le=1000.0),
+    format: Literal["speedscope", "collapsed"] = "speedscope",
+):
+    """Sample all threads for `seconds` (capped at ADMIN_PROFILE_MAX_S) and return the profile."""
+    if _profile_lock.locked():
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    async with _profile_lock:
+        sampler = diagnostics.StackSampler(interval_s=interval_ms / 1000).start()
+        try:
+            await asyncio.sleep(min(seconds, settings.ADMIN_PROFILE_MAX_S))
+        finally:
+            await asyncio.to_thread(sampler.stop)
+    if format == "collapsed":
+        return PlainTextResponse(sampler.to_collapsed())
+    return sampler.to_speedscope(name=f"cpu-{int(sampler.elapsed)}s")
+
+
+@router.get("/profile/requests/{profile_id}")
+async def request_profile(profile_id: str):
+    profile = diagnostics.get_request_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+
+@router.post("/memory/start")
+async def memory_start(frames: int = Query(10, ge=1, le=100)):
+    diagnostics.memory_start(frames)
+    return {"tracing": True}
+
+
+@router.post("/memory/stop")
+async def memory_stop():
+    diagnostics.memory_stop()
+    return {"tracing": False}
+
+
+@router.get("/memory/snapshot")
+async def memory_snapshot(
+    limit: int = Query(25, ge=1, le=500),
+    group_by: Literal["lineno", "filename", "traceback"] = "lineno",
+):
+    if not tracemalloc.is_tracing():
+        raise HTTPException(status_code=400, detail="tracemalloc is not running (POST /memory/start)")
+    report = await asyncio.to_thread(diagnostics.memory_snapshot, limit, group_by)
+
+    near_dup = get_near_dup_index()
+    thread_pool = get_thread_pool()
+    report["stores"] = {
+        "session_uploads": SESSION_UPLOADS.stats(),
+        "near_dup_entries": near_dup.stats()["entries"] if near_dup else None,
+        "paragraph_results": len(get_paragraph_store()),
+        "thread_pool": thread_pool.stats() if thread_pool else None,
+    }
+    return report
+
+
+@router.get("/runtime")
+async def runtime():
+    return {
+        "loop_lag": diagnostics.loop_lag.stats(),
+        "executor": diagnostics.executor_stats(asyncio.get_running_loop()),
+        "threads": threading.active_count(),
+        "asyncio_tasks": len(asyncio.all_tasks()),
+        "gc_counts": gc.get_count(),
+        "tracemalloc": tracemalloc.is_tracing(),
+    }
@@ -1,28 +1,83 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
 from fastapi.responses import JSONResponse
+from typing import Optional
 from ...deps import require_api_key
 from ...config import settings
 from ...services.gpt_service import OpenAIClient
+from ...services.paragraphs import hash_document
+from ...services.upload_store import UploadStore
+from ...utils.auth import key_scope
+import asyncio
+import io
 import logging
 
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None  # optional
+
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-@router.post("/docs/upload")
+# (API key scope, session_id) -> extracted text of the latest upload (in memory only, LRU + TTL)
+SESSION_UPLOADS = UploadStore(
+    max_sessions=settings.UPLOAD_MAX_SESSIONS,
+    max_total_chars=settings.UPLOAD_MAX_TOTAL_CHARS,
+    ttl_s=settings.UPLOAD_TTL_S,
+)
+
+
+def _extract_text(filename: str, contents: bytes) -> str:
+    """Extract plain text from .txt/.md (UTF-8, latin-1 fallback) or .pdf uploads."""
+    if (filename or "").lower().endswith(".pdf"):
+        if PdfReader is None:
+            raise HTTPException(status_code=400, detail="PDF support requires pypdf")
+        reader = PdfReader(io.BytesIO(contents))
+        return "\n\n".join((page.extract_text() or "") for page in reader.pages)
+    try:
+        return contents.decode("utf-8")
+    except UnicodeDecodeError:
+        return contents.decode("latin-1", errors="ignore")
+
+
+@router.post("/upload")
 async def upload_doc(
     file: UploadFile = File(...),
+    session_id: Optional[str] = Form(default=None),
     api_key: str = Depends(require_api_key)
 ):
     """
-    Upload a document to the assistant's vector store (OpenAI only).
-    Accepts .txt, .md, .pdf files. Requires GPT_PROVIDER=openai.
-    Enforces a max file size of 5MB.
+    Upload a document.
+    - With `session_id`: text is kept in memory for that session and injected as context
+      into /v1/generate. Re-uploads report how many paragraphs changed.
+    - Without: uploads to the assistant's vector store (requires GPT_PROVIDER=openai).
+    Accepts .txt, .md, .pdf files. Enforces a max file size of 5MB.
     """
     MAX_SIZE = 5 * 1024 * 1024  # 5MB
     contents = await file.read()
     if len(contents) > MAX_SIZE:
         raise HTTPException(status_code=413, detail="File too large (max 5MB)")
 
+    if session_id:
+        try:
+            text = await asyncio.to_thread(_extract_text, file.filename, contents)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.exception("extract_failed")
+            raise HTTPException(status_code=400, detail=f"Could not read file: {e}")
+        scope = key_scope(api_key)
+        previous = {h for h, _ in hash_document(SESSION_UPLOADS.get(scope, session_id) or "")}
+        hashes = [h for h, _ in hash_document(text)]
+        SESSION_UPLOADS.set(scope, session_id, text)
+        return JSONResponse({
+            "ok": True,
+            "filename": file.filename,
+            "session_id": session_id,
+            "paragraphs": len(hashes),
+            "changed_paragraphs": sum(1 for h in hashes if h not in previous),
+        })
+
     if settings.GPT_PROVIDER != "openai":
         raise HTTPException(status_code=400, detail="Upload supported only with GPT_PROVIDER=openai")
 
@@ -1,6 +1,9 @@
 # app/routes/v1/generate.py
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import time
 import logging
 from typing import List, Optional
@@ -8,13 +11,19 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, Header, HTTPException
 from pydantic import BaseModel, Field
 
-from ...deps import require_api_key, get_gpt_client, get_request_context
+from ...config import settings
+from ...deps import (
+    require_api_key,
+    get_gpt_client,
+    get_request_context,
+    get_near_dup_index,
+    get_paragraph_store,
+)
 from ...services.gpt_service import GPTClient
-# If you wired the in-memory uploads in docs.py as shown earlier:
-try:
-    from .docs import SESSION_UPLOADS  # session_id -> extracted text
-except Exception:  # if not present, keep things working
-    SESSION_UPLOADS = {}
+from ...utils.auth import key_scope
+from ...services.near_dup import NearDupIndex
+from ...services.paragraphs import ParagraphStore, hash_document
+from .docs import SESSION_UPLOADS  # (API key scope, session_id) -> extracted text
 
 router = APIRouter()
 log = logging.getLogger("app.routes.v1.generate")
@@ -33,6 +42,7 @@ class GenerateRequest(BaseModel):
     max_tokens: Optional[int] = 600
     stream: Optional[bool] = False
     session_id: Optional[str] = None  # to link ephemeral uploads
+    incremental: Optional[bool] = False  # review only new/modified paragraphs, reuse the rest
 
 
 class GenerateResponse(BaseModel):
@@ -43,6 +53,66 @@ class GenerateResponse(BaseModel):
     latency_ms: int
 
 
+# ----- Incremental review -----
+
+async def _incremental_review(
+    client: GPTClient,
+    store: ParagraphStore,
+    document: str,
+    instruction: str,
+    body: GenerateRequest,
+    scope: str,
+) -> tuple[str, dict, Optional[str]]:
+    """
+    Review `document` paragraph by paragraph. Paragraphs whose hash is already in `store`
+    reuse their findings; the rest go to the model (bounded concurrency) and are stored.
+    Paragraph reviews are stateless: no chat history and no Assistants thread.
+    Findings are keyed per `scope` (the caller's API key) and instruction.
+    """
+    paragraphs = hash_document(document, scope=f"{scope}\x00{instruction}")
+    pending = {h: p for h, p in paragraphs if store.get(h) is None}
+    sem = asyncio.Semaphore(max(1, settings.PARAGRAPH_CONCURRENCY))
+    totals = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+    model: Optional[str] = None
+
+    async def review(h: str, paragraph: str) -> None:
+        nonlocal model
+        prompt = f"{instruction}\n\nParagraph:\n{paragraph}" if instruction else paragraph
+        async with sem:
+            content, usage, model = await client.review(
+                prompt,
+                temperature=body.temperature or 0.6,
+                max_tokens=body.max_tokens or 600,
+            )
+        for k in totals:
+            if isinstance((usage or {}).get(k), int):
+                totals[k] += usage[k]
+        if content and (usage or {}).get("status", "ok") == "ok":
+            store.set(h, content)
+
+    await asyncio.gather(*(review(h, p) for h, p in pending.items()))
+
+    sections = []
+    for i, (h, _) in enumerate(paragraphs, start=1):
+        sections.append(f"**Paragraph {i}**\n\n{store.get(h) or 'No findings available.'}")
+    usage = {
+        **totals,
+        "paragraphs": len(paragraphs),
+        "reviewed_paragraphs": len(pending),
+        "reused_paragraphs": len(paragraphs) - len(pending),
+    }
+    return "\n\n".join(sections), usage, model
+
+
+def _near_dup_scope(api_key: str, prior: List[dict], body: GenerateRequest) -> str:
+    """Near-dup partition: caller + exact system prompt / earlier turns / generation params."""
+    context = json.dumps(
+        {"messages": prior, "temperature": body.temperature, "max_tokens": body.max_tokens},
+        sort_keys=True,
+    )
+    return f"{key_scope(api_key)}:{hashlib.sha256(context.encode()).hexdigest()[:16]}"
+
+
 # ----- Route -----
 
 @router.post("/generate", response_model=GenerateResponse)
@@ -50,6 +120,8 @@ async def generate(
     body: GenerateRequest,
     _api_key: str = Depends(require_api_key),
     client: GPTClient = Depends(get_gpt_client),
+    near_dup: Optional[NearDupIndex] = Depends(get_near_dup_index),
+    paragraph_store: ParagraphStore = Depends(get_paragraph_store),
 ):
     ctx = get_request_context()
     t0 = time.perf_counter()
@@ -60,18 +132,55 @@ async def generate(
     # Pull ephemeral doc text for this session (if any) and pass as context_text
     context_text = ""
     if body.session_id:
-        context_text = SESSION_UPLOADS.get(body.session_id, "") or ""
+        context_text = SESSION_UPLOADS.get(key_scope(_api_key), body.session_id) or ""
+
+    # Near-duplicate reuse: lightly edited resubmissions get the previous review.
+    # Only stateless submissions qualify: with a session_id the text may be a question about an
+    # upload (uploads stay ephemeral) and a reused reply would never reach the Assistants thread.
+    # Incremental mode has its own paragraph-level reuse and must see edited paragraphs.
+    # Entries are scoped to the caller's API key plus everything else that shapes the reply
+    # (system prompt, earlier turns, generation params); only the last user turn is fuzzy-matched.
+    review_text = ""
+    near_dup_sig = None
+    if near_dup is not None and not body.session_id and not body.incremental:
+        review_text = messages[-1]["content"] if messages and messages[-1].get("role") == "user" else ""
+        if not settings.NEAR_DUP_MIN_CHARS <= len(review_text) <= settings.NEAR_DUP_MAX_CHARS:
+            review_text = ""
+    if review_text:
+        near_dup_scope = _near_dup_scope(_api_key, messages[:-1], body)
+        hit, near_dup_sig = await asyncio.to_thread(near_dup.lookup, review_text, near_dup_scope)
+        if hit:
+            log.info("near_dup_hit similarity=%s request_id=%s", hit["similarity"], ctx["request_id"])
+            return GenerateResponse(
+                content=hit["content"],
+                usage={"status": "reused", "similarity": hit["similarity"]},
+                model=hit["model"],
+                request_id=ctx["request_id"],
+                latency_ms=int((time.perf_counter() - t0) * 1000),
+            )
 
     try:
-        # IMPORTANT: await and unpack the tuple
-        content, usage, model = await client.generate(
-            messages=messages,
-            temperature=body.temperature or 0.6,
-            max_tokens=body.max_tokens or 600,
-            stream=False,  # streaming not implemented in this path
-            session_id=body.session_id,
-            context_text=context_text if context_text else None,
-        )
+        if body.incremental:
+            # Document is the session upload if any, else the latest user message
+            last_user = next((m["content"] for m in reversed(messages) if m.get("role") == "user"), "")
+            document, instruction = (context_text, last_user) if context_text else (last_user, "")
+            content, usage, model = await _incremental_review(
+                client, paragraph_store, document, instruction, body, key_scope(_api_key)
+            )
+        else:
+            # IMPORTANT: await and unpack the tuple
+            content, usage, model = await client.generate(
+                messages=messages,
+                temperature=body.temperature or 0.6,
+                max_tokens=body.max_tokens or 600,
+                stream=False,  # streaming not implemented in this path
+                session_id=body.session_id,
+                context_text=context_text if context_text else None,
+                scope=key_scope(_api_key),
+            )
+
+        if review_text and content and (usage or {}).get("status", "ok") == "ok":
+            await asyncio.to_thread(near_dup.add, review_text, content, model, near_dup_scope, near_dup_sig)
 
         latency_ms = int((time.perf_counter() - t0) * 1000)
         return GenerateResponse(
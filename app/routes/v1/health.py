@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 from ...config import settings
 from ...services.cache import Cache
+from ...deps import get_near_dup_index, get_thread_pool
 
 router = APIRouter()
 
@@ -9,11 +10,15 @@ async def health():
     """
     Health check endpoint. Returns app status and environment info.
     """
+    near_dup = get_near_dup_index()
+    thread_pool = get_thread_pool()
     return {
         "app": settings.APP_NAME,
         "env": settings.APP_ENV,
         "redis": bool(Cache(settings.REDIS_URL).available()),
         "provider": settings.GPT_PROVIDER,
+        "near_dup": near_dup.stats() if near_dup else None,
+        "thread_pool": thread_pool.stats() if thread_pool else None,
         "status": "ok",
     }
 
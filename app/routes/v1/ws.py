@@ -0,0 +1,289 @@
+# app/routes/v1/ws.py
+"""
+WebSocket chat: authenticate once, keep session state on the connection, stream replies.
+
+Client -> server
+  {"type": "auth", "api_key": "...", "session_id": "...", "history": [{"role": "user", "content": "..."}]}
+      first frame, unless X-API-Key was sent on the handshake; session_id/history are optional and
+      let a reconnecting client resume its session (history seeds the conversation)
+  {"type": "message", "id": "1", "content": "...", "temperature": 0.6, "max_tokens": 600}
+  {"type": "cancel", "id": "1"}
+  {"type": "pong"}
+Server -> client
+  {"type": "ready", "session_id": "..."}
+  {"type": "token", "id": "1", "delta": "..."}
+  {"type": "done", "id": "1", "content": "...", "usage": {...}, "model": "...", "latency_ms": 12}
+  {"type": "cancelled", "id": "1"} | {"type": "error", "id": "1", "detail": "..."}
+  {"type": "ping"}
+
+Invalid frames get an error frame and the connection stays open. Idle time counts only
+message/cancel frames, so pongs from an open tab don't keep it alive past WS_IDLE_TIMEOUT_S.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, status
+
+from ...config import settings
+from ...deps import get_gpt_client
+from ...services.gpt_service import GPTClient
+from ...utils.auth import key_scope
+from .docs import SESSION_UPLOADS
+
+router = APIRouter()
+log = logging.getLogger("app.routes.v1.ws")
+
+
+class _FrameError(ValueError):
+    """Client frame that cannot be processed; reported as an error frame."""
+
+
+def _parse_message(data: dict) -> Tuple[str, float, int]:
+    """Validate a "message" frame -> (content, temperature, max_tokens)."""
+    content = data.get("content")
+    if not isinstance(content, str) or not content.strip():
+        raise _FrameError("Empty message")
+    if len(content) > 8000:
+        raise _FrameError("Message too long (max 8000 chars)")
+    try:
+        temperature = float(data.get("temperature", 0.6))
+        max_tokens = int(data.get("max_tokens", 600))
+    except (TypeError, ValueError):
+        raise _FrameError("temperature must be a number and max_tokens an integer")
+    if not 0.0 <= temperature <= 2.0 or not 1 <= max_tokens <= 4096:
+        raise _FrameError("temperature must be in [0, 2] and max_tokens in [1, 4096]")
+    return content.strip(), temperature, max_tokens
+
+
+class _ChatSession:
+    """
+    Per-connection state: history, in-flight requests and a send lock.
+    Clients with server-side threads (Assistants) accept one run per thread at a time, so their
+    requests are queued on `_run_lock`; other clients run concurrently.
+    """
+
+    def __init__(self, ws: WebSocket, client: GPTClient, session_id: str, scope: str):
+        self.ws = ws
+        self.client = client
+        self.session_id = session_id
+        self.scope = scope  # API key scope, for per-caller uploads
+        self.history: List[Dict[str, str]] = []
+        self.inflight: Dict[str, asyncio.Task] = {}
+        self.last_seen = time.monotonic()  # last message/cancel frame (pongs don't count)
+        self.closing = False
+        self._send_lock = asyncio.Lock()
+        self._run_lock = asyncio.Lock() if client.threaded_sessions else None
+
+    async def send(self, payload: dict) -> None:
+        async with self._send_lock:
+            await self.ws.send_json(payload)
+
+    async def run(self, req_id: str, content: str, temperature: float, max_tokens: int) -> None:
+        t0 = time.perf_counter()
+        user_turn = {"role": "user", "content": content}
+
+        async def on_delta(delta: str) -> None:
+            await self.send({"type": "token", "id": req_id, "delta": delta})
+
+        async def generate():
+            return await self.client.generate_stream(
+                messages=self.history + [user_turn],
+                on_delta=on_delta,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                session_id=self.session_id,
+                context_text=SESSION_UPLOADS.get(self.scope, self.session_id) or None,
+                scope=self.scope,
+            )
+
+        try:
+            if self._run_lock:
+                async with self._run_lock:
+                    text, usage, model = await generate()
+            else:
+                text, usage, model = await generate()
+            # Only completed turns enter the history, user and reply together
+            self.history += [user_turn, {"role": "assistant", "content": text or ""}]
+            await self.send({
+                "type": "done",
+                "id": req_id,
+                "content": text or "",
+                "usage": usage or {},
+                "model": model,
+                "latency_ms": int((time.perf_counter() - t0) * 1000),
+            })
+        except asyncio.CancelledError:
+            await self._send_quietly({"type": "cancelled", "id": req_id})
+        except Exception as e:
+            log.exception("ws_generate_failed: %s", e)
+            await self._send_quietly({"type": "error", "id": req_id, "detail": "Upstream generation failed"})
+
+    async def heartbeat(self, receiver: asyncio.Task) -> None:
+        """
+        Ping every WS_HEARTBEAT_S; close the socket once idle for WS_IDLE_TIMEOUT_S.
+        On idle close or a failed ping, the receive loop (`receiver`) is cancelled.
+        """
+        try:
+            while True:
+                await asyncio.sleep(settings.WS_HEARTBEAT_S)
+                if not self.inflight and time.monotonic() - self.last_seen > settings.WS_IDLE_TIMEOUT_S:
+                    log.info("ws_idle_close session_id=%s", self.session_id)
+                    self.closing = True
+                    await self.ws.close(code=status.WS_1000_NORMAL_CLOSURE)
+                    break
+                await self.send({"type": "ping"})
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            log.info("ws_heartbeat_failed session_id=%s", self.session_id)
+        self.closing = True
+        receiver.cancel()
+
+    def track(self, req_id: str, task: asyncio.Task) -> None:
+        self.inflight[req_id] = task
+
+        def _done(t: asyncio.Task) -> None:
+            self.inflight.pop(req_id, None)
+            if t.cancelled() and not self.closing:  # cancelled before `run` started
+                asyncio.ensure_future(self._send_quietly({"type": "cancelled", "id": req_id}))
+
+        task.add_done_callback(_done)
+
+    async def _send_quietly(self, payload: dict) -> None:
+        try:
+            await self.send(payload)
+        except Exception:
+            pass  # socket already gone
+
+    def cancel_all(self) -> None:
+        for task in list(self.inflight.values()):
+            task.cancel()
+
+
+def _parse_history(raw) -> List[Dict[str, str]]:
+    """Validate the optional seed history of an auth frame."""
+    if raw is None:
+        return []
+    if not isinstance(raw, list) or len(raw) > settings.WS_MAX_SEED_TURNS:
+        raise _FrameError(f"history must be a list of at most {settings.WS_MAX_SEED_TURNS} turns")
+    turns = []
+    for m in raw:
+        if (
+            not isinstance(m, dict)
+            or m.get("role") not in ("user", "assistant")
+            or not isinstance(m.get("content"), str)
+            or len(m["content"]) > 8000
+        ):
+            raise _FrameError("history turns need role user|assistant and content (max 8000 chars)")
+        turns.append({"role": m["role"], "content": m["content"]})
+    return turns
+
+
+async def _authenticate(ws: WebSocket) -> Optional[dict]:
+    """
+    Return {"api_key", "session_id", "history"} or None.
+    Keys are never read from the URL (access logs and proxies record it): either the X-API-Key
+    handshake header or the first frame {"type": "auth", "api_key": ...}.
+    """
+    header_key = ws.headers.get("x-api-key")
+    if header_key:
+        if header_key not in settings.API_KEYS:
+            return None
+        return {"api_key": header_key, "session_id": ws.query_params.get("session_id"), "history": []}
+    try:
+        data = json.loads(await asyncio.wait_for(ws.receive_text(), settings.WS_AUTH_TIMEOUT_S))
+    except (asyncio.TimeoutError, ValueError, KeyError, RuntimeError, WebSocketDisconnect):
+        return None
+    if not isinstance(data, dict) or data.get("type") != "auth" or data.get("api_key") not in settings.API_KEYS:
+        return None
+    sid = data.get("session_id")
+    try:
+        history = _parse_history(data.get("history"))
+    except _FrameError:
+        return None
+    return {"api_key": data["api_key"], "session_id": sid if isinstance(sid, str) else None, "history": history}
+
+
+@router.websocket("/ws/chat")
+async def ws_chat(
+    websocket: WebSocket,
+    client: GPTClient = Depends(get_gpt_client),
+):
+    await websocket.accept()
+    auth = await _authenticate(websocket)
+    if not auth:
+        try:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        except RuntimeError:
+            pass  # client already gone
+        return
+
+    session = _ChatSession(
+        websocket,
+        client,
+        (auth["session_id"] or str(uuid.uuid4()))[:128],
+        key_scope(auth["api_key"]),
+    )
+    session.history = auth["history"]
+    await session.send({"type": "ready", "session_id": session.session_id})
+    heartbeat = asyncio.create_task(session.heartbeat(asyncio.current_task()))
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", status.WS_1000_NORMAL_CLOSURE))
+            try:
+                data = json.loads(message.get("text") or message.get("bytes") or b"")
+            except ValueError:
+                await session.send({"type": "error", "id": None, "detail": "Invalid JSON"})
+                continue
+            if not isinstance(data, dict):
+                await session.send({"type": "error", "id": None, "detail": "Frame must be a JSON object"})
+                continue
+            kind = data.get("type")
+            req_id = str(data["id"]) if data.get("id") is not None else None
+
+            if kind == "message":
+                session.last_seen = time.monotonic()
+                req_id = req_id or str(uuid.uuid4())
+                try:
+                    content, temperature, max_tokens = _parse_message(data)
+                except _FrameError as e:
+                    await session.send({"type": "error", "id": req_id, "detail": str(e)})
+                    continue
+                if req_id in session.inflight:
+                    await session.send({"type": "error", "id": req_id, "detail": "Duplicate request id"})
+                    continue
+                if len(session.inflight) >= settings.WS_MAX_INFLIGHT:
+                    await session.send({"type": "error", "id": req_id, "detail": "Too many in-flight requests"})
+                    continue
+                session.track(req_id, asyncio.create_task(
+                    session.run(req_id, content, temperature, max_tokens)
+                ))
+            elif kind == "cancel":
+                session.last_seen = time.monotonic()
+                task = session.inflight.get(req_id)
+                if task:
+                    task.cancel()
+            elif kind == "pong":
+                pass
+            else:
+                await session.send({"type": "error", "id": req_id, "detail": f"Unknown type: {kind}"})
+    except WebSocketDisconnect:
+        pass
+    except asyncio.CancelledError:
+        if not session.closing:
+            raise
+    except Exception:
+        log.exception("ws_chat_failed session_id=%s", session.session_id)
+    finally:
+        session.closing = True
+        heartbeat.cancel()
+        session.cancel_all()
@@ -0,0 +1,247 @@
+# app/services/diagnostics.py
+"""
+Runtime diagnostics for admin endpoints.
+
+- StackSampler: time-boxed sampling CPU profiler (all or selected threads) with collapsed/speedscope output
+- Memory: tracemalloc snapshots and diffs against the previous snapshot
+- LoopLagMonitor: event-loop lag measured from sleep drift
+- executor_stats: saturation of the default executor used by asyncio.to_thread
+Nothing here runs unless ADMIN_ENABLED is set.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, OrderedDict, deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+Frame = Tuple[str, str, int]  # (function, file, line)
+
+
+# ---------- CPU sampling ----------
+
+class StackSampler:
+    """
+    Samples thread stacks via sys._current_frames() at a fixed interval.
+    `threads`, if given, returns the thread idents to sample on each tick (default: all threads).
+    """
+
+    def __init__(
+        self,
+        interval_s: float = 0.005,
+        max_depth: int = 128,
+        threads: Optional[Callable[[], Iterable[int]]] = None,
+    ):
+        self.interval_s = interval_s
+        self.max_depth = max_depth
+        self.threads = threads
+        self.samples: Counter = Counter()  # tuple[Frame, ...] (root first) -> count
+        self.started = 0.0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "StackSampler":
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "StackSampler":
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+        return self
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval_s):
+            if len(names) != threading.active_count():
+                names = {t.ident: t.name for t in threading.enumerate()}
+            wanted = set(self.threads()) if self.threads else None
+            for ident, frame in sys._current_frames().items():
+                if ident == me or (wanted is not None and ident not in wanted):
+                    continue
+                stack: List[Frame] = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append((code.co_name, code.co_filename, frame.f_lineno))
+                    frame = frame.f_back
+                stack.append((f"thread:{names.get(ident, ident)}", "", 0))
+                self.samples[tuple(reversed(stack))] += 1
+
+    # ------------- Output -------------
+
+    def to_collapsed(self) -> str:
+        """Brendan Gregg's collapsed-stack format (flamegraph.pl / speedscope / inferno)."""
+        lines = []
+        for stack, count in self.samples.most_common():
+            names = ";".join(f"{fn} ({file}:{line})" if file else fn for fn, file, line in stack)
+            lines.append(f"{names} {count}")
+        return "\n".join(lines) + "\n"
+
+    def to_speedscope(self, name: str = "cpu") -> Dict:
+        """speedscope.app JSON (sampled profile, weights in seconds)."""
+        frames: List[Dict] = []
+        index: Dict[Frame, int] = {}
+        samples, weights = [], []
+        for stack, count in self.samples.items():
+            ids = []
+            for fr in stack:
+                if fr not in index:
+                    index[fr] = len(frames)
+                    frames.append({"name": fr[0], "file": fr[1], "line": fr[2]})
+                ids.append(index[fr])
+            samples.append(ids)
+            weights.append(count * self.interval_s)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "app.diagnostics",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": round(self.elapsed, 6),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+
+# Per-request profiles (X-Debug-Profile), newest last
+_REQUEST_PROFILES: "OrderedDict[str, Dict]" = OrderedDict()
+MAX_REQUEST_PROFILES = 20
+
+
+def store_request_profile(profile_id: str, profile: Dict) -> None:
+    _REQUEST_PROFILES[profile_id] = profile
+    while len(_REQUEST_PROFILES) > MAX_REQUEST_PROFILES:
+        _REQUEST_PROFILES.popitem(last=False)
+
+
+def get_request_profile(profile_id: str) -> Optional[Dict]:
+    return _REQUEST_PROFILES.get(profile_id)
+
+
+# ---------- Memory ----------
+
+_last_snapshot: Optional[tracemalloc.Snapshot] = None
+
+
+def memory_start(frames: int = 10) -> None:
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def memory_stop() -> None:
+    global _last_snapshot
+    _last_snapshot = None
+    tracemalloc.stop()
+
+
+def memory_snapshot(limit: int = 25, group_by: str = "lineno") -> Dict:
+    """Top allocations, plus growth since the previous snapshot (which this one replaces)."""
+    global _last_snapshot
+    snap = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ))
+    current, peak = tracemalloc.get_traced_memory()
+    out = {
+        "traced_bytes": current,
+        "peak_bytes": peak,
+        "top": [
+            {"where": str(s.traceback), "size_bytes": s.size, "count": s.count}
+            for s in snap.statistics(group_by)[:limit]
+        ],
+        "diff": None,
+    }
+    if _last_snapshot is not None:
+        out["diff"] = [
+            {"where": str(d.traceback), "size_diff_bytes": d.size_diff, "count_diff": d.count_diff}
+            for d in snap.compare_to(_last_snapshot, group_by)[:limit]
+        ]
+    _last_snapshot = snap
+    return out
+
+
+# ---------- Event loop / executor ----------
+
+class LoopLagMonitor:
+    """Measures how late `asyncio.sleep(interval)` wakes up; lateness = event-loop lag."""
+
+    def __init__(self, interval_s: float = 0.5, window: int = 120):
+        self.interval_s = interval_s
+        self._lags: Deque[float] = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+
+    async def _run(self) -> None:
+        while True:
+            t0 = time.perf_counter()
+            await asyncio.sleep(self.interval_s)
+            self._lags.append(max(0.0, time.perf_counter() - t0 - self.interval_s))
+
+    def stats(self) -> Dict:
+        lags = sorted(self._lags)
+        if not lags:
+            return {"samples": 0}
+        return {
+            "samples": len(lags),
+            "last_ms": round(self._lags[-1] * 1000, 3),
+            "p50_ms": round(lags[len(lags) // 2] * 1000, 3),
+            "p99_ms": round(lags[min(len(lags) - 1, int(len(lags) * 0.99))] * 1000, 3),
+            "max_ms": round(lags[-1] * 1000, 3),
+        }
+
+
+loop_lag = LoopLagMonitor()
+
+
+def loop_and_executor_threads(loop: asyncio.AbstractEventLoop) -> Callable[[], List[int]]:
+    """Thread selector for StackSampler: the calling (event-loop) thread plus the default
+    executor's workers, read on every tick since the executor grows lazily."""
+    loop_ident = threading.get_ident()
+
+    def select() -> List[int]:
+        ex = getattr(loop, "_default_executor", None)
+        workers = [t.ident for t in getattr(ex, "_threads", ()) if t.ident is not None]
+        return [loop_ident] + workers
+
+    return select
+
+
+def executor_stats(loop: asyncio.AbstractEventLoop) -> Dict:
+    """Default ThreadPoolExecutor (asyncio.to_thread) usage; relies on CPython internals."""
+    ex = getattr(loop, "_default_executor", None)
+    if ex is None:
+        return {"started": False}
+    threads = len(getattr(ex, "_threads", ()))
+    idle_sem = getattr(ex, "_idle_semaphore", None)
+    idle = getattr(idle_sem, "_value", 0) if idle_sem else 0
+    max_workers = getattr(ex, "_max_workers", None)
+    busy = max(0, threads - idle)
+    return {
+        "started": True,
+        "max_workers": max_workers,
+        "threads": threads,
+        "busy": busy,
+        "queued": ex._work_queue.qsize() if hasattr(ex, "_work_queue") else None,
+        "saturation": round(busy / max_workers, 3) if max_workers else None,
+    }
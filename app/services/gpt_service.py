@@ -3,17 +3,32 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import threading
 import time
-from typing import Dict, List, Optional, Tuple
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 
 from openai import OpenAI
 
+from .thread_pool import AssistantThreadPool
+
 log = logging.getLogger("app.gpt_service")
 
+# Callback receiving each streamed text delta
+DeltaCallback = Callable[[str], Awaitable[None]]
+
+# assistant_id -> instructions (clients are built per request; fetch once per process)
+_INSTRUCTIONS: Dict[str, Optional[str]] = {}
+
 
 # ---------- Interface ----------
 
 class GPTClient:
+    # True when replies run on a per-session server-side thread that accepts one run at a time
+    threaded_sessions: bool = False
+
+    # `scope` (key_scope of the caller's API key) partitions server-side session state, so the same
+    # session_id sent with two different keys never shares a thread.
+
     async def generate(
         self,
         messages: List[Dict[str, str]],
@@ -22,9 +37,47 @@ class GPTClient:
         stream: bool = False,
         session_id: Optional[str] = None,
         context_text: Optional[str] = None,
+        scope: str = "",
     ) -> Tuple[str, Dict, Optional[str]]:
         raise NotImplementedError
 
+    async def generate_stream(
+        self,
+        messages: List[Dict[str, str]],
+        on_delta: DeltaCallback,
+        temperature: float = 0.6,
+        max_tokens: int = 600,
+        session_id: Optional[str] = None,
+        context_text: Optional[str] = None,
+        scope: str = "",
+    ) -> Tuple[str, Dict, Optional[str]]:
+        """Stream text deltas to `on_delta`, then return the same tuple as `generate`.
+        Default: no upstream streaming, the whole reply is delivered as one delta."""
+        content, usage, model = await self.generate(
+            messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            session_id=session_id,
+            context_text=context_text,
+            scope=scope,
+        )
+        if content:
+            await on_delta(content)
+        return content, usage, model
+
+    async def review(
+        self,
+        prompt: str,
+        temperature: float = 0.6,
+        max_tokens: int = 600,
+    ) -> Tuple[str, Dict, Optional[str]]:
+        """One-off, stateless completion of `prompt` (no history, no session/thread)."""
+        return await self.generate(
+            [{"role": "user", "content": prompt}],
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+
 
 # ---------- Dev stub ----------
 
@@ -37,11 +90,27 @@ class EchoClient(GPTClient):
         stream: bool = False,
         session_id: Optional[str] = None,
         context_text: Optional[str] = None,
+        scope: str = "",
     ) -> Tuple[str, Dict, Optional[str]]:
         last = next((m["content"] for m in reversed(messages) if m.get("role") == "user"), "")
         content = f"[echo] {last}"
         return content, {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}, "echo"
 
+    async def generate_stream(
+        self,
+        messages: List[Dict[str, str]],
+        on_delta: DeltaCallback,
+        temperature: float = 0.0,
+        max_tokens: int = 100,
+        session_id: Optional[str] = None,
+        context_text: Optional[str] = None,
+        scope: str = "",
+    ) -> Tuple[str, Dict, Optional[str]]:
+        content, usage, model = await self.generate(messages, temperature, max_tokens)
+        for i, word in enumerate(content.split(" ")):
+            await on_delta(word if i == 0 else " " + word)
+        return content, usage, model
+
 
 # ---------- OpenAI client (Assistant first, chat fallback) ----------
 
@@ -52,11 +121,19 @@ class OpenAIClient(GPTClient):
     Otherwise -> use Chat Completions as a fallback.
     """
 
-    def __init__(self, api_key: str, model: str, assistant_id: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        assistant_id: Optional[str] = None,
+        thread_pool: Optional[AssistantThreadPool] = None,
+    ):
         self.client = OpenAI(api_key=api_key)
         self.model = model
         self.assistant_id = assistant_id
-        self._threads: Dict[str, str] = {}  # session_id -> thread_id
+        self.thread_pool = thread_pool  # shared, pre-warmed threads + session map
+        self._threads: Dict[Tuple[str, str], str] = {}  # (scope, session_id) -> thread_id (when no pool)
+        self.threaded_sessions = bool(assistant_id)
 
         mode = "assistant" if assistant_id else "chat"
         tail = (assistant_id or "")[:10]
@@ -72,6 +149,7 @@ class OpenAIClient(GPTClient):
         stream: bool = False,
         session_id: Optional[str] = None,
         context_text: Optional[str] = None,
+        scope: str = "",
     ) -> Tuple[str, Dict, Optional[str]]:
         if self.assistant_id:
             # Assistant path via beta.threads/runs – wrap blocking SDK calls in a thread
@@ -83,6 +161,8 @@ class OpenAIClient(GPTClient):
                 stream,
                 session_id,
                 context_text,
+                None,
+                scope,
             )
 
         # Fallback: Chat Completions (blocking SDK call → thread)
@@ -94,15 +174,125 @@ class OpenAIClient(GPTClient):
             stream,
         )
 
+    async def generate_stream(
+        self,
+        messages: List[Dict[str, str]],
+        on_delta: DeltaCallback,
+        temperature: float = 0.6,
+        max_tokens: int = 600,
+        session_id: Optional[str] = None,
+        context_text: Optional[str] = None,
+        scope: str = "",
+    ) -> Tuple[str, Dict, Optional[str]]:
+        if self.assistant_id:
+            # Assistant runs are polled to completion; deliver the reply as one delta.
+            # On cancellation the upstream run is cancelled and awaited so the thread is unlocked.
+            stop = threading.Event()
+            worker = asyncio.get_running_loop().run_in_executor(
+                None,
+                self._assistant_reply_sync,
+                messages,
+                temperature,
+                max_tokens,
+                True,
+                session_id,
+                context_text,
+                stop,
+                scope,
+            )
+            try:
+                content, usage, model = await asyncio.shield(worker)
+            except asyncio.CancelledError:
+                stop.set()
+                try:
+                    await worker
+                except Exception:
+                    pass
+                raise
+            if content:
+                await on_delta(content)
+            return content, usage, model
+
+        # Chat Completions stream: blocking iterator in a thread, deltas handed over via a queue
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def _pump() -> None:
+            try:
+                stream = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stream=True,
+                )
+                for chunk in stream:
+                    if stop.is_set():
+                        stream.close()
+                        break
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        loop.call_soon_threadsafe(queue.put_nowait, delta)
+                loop.call_soon_threadsafe(queue.put_nowait, None)
+            except Exception as e:  # surfaced on the event loop side
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+
+        worker = loop.run_in_executor(None, _pump)
+        parts: List[str] = []
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                parts.append(item)
+                await on_delta(item)
+        finally:
+            stop.set()  # also reached on cancellation
+        await worker
+        return "".join(parts), {"status": "ok", "source": "chat_stream"}, self.model
+
+    async def review(
+        self,
+        prompt: str,
+        temperature: float = 0.6,
+        max_tokens: int = 600,
+    ) -> Tuple[str, Dict, Optional[str]]:
+        # Always Chat Completions: no thread to create, lock or clean up. In assistant mode the
+        # assistant's instructions are used as the system prompt so the reply keeps its persona.
+        return await asyncio.to_thread(self._review_sync, prompt, temperature, max_tokens)
+
+    # ------------- Internals: stateless review (sync) -------------
+
+    def _assistant_instructions(self) -> Optional[str]:
+        if self.assistant_id not in _INSTRUCTIONS:
+            try:
+                a = self.client.beta.assistants.retrieve(self.assistant_id)
+                _INSTRUCTIONS[self.assistant_id] = getattr(a, "instructions", None)
+            except Exception:
+                log.warning("assistant_instructions_unavailable assistant_id=%s", (self.assistant_id or "")[:10])
+                return None
+        return _INSTRUCTIONS[self.assistant_id]
+
+    def _review_sync(self, prompt: str, temperature: float, max_tokens: int) -> Tuple[str, Dict, Optional[str]]:
+        messages = [{"role": "user", "content": prompt}]
+        instructions = self._assistant_instructions() if self.assistant_id else None
+        if instructions:
+            messages.insert(0, {"role": "system", "content": instructions})
+        return self._chat_reply_sync(messages, temperature, max_tokens, False)
+
     # ------------- Internals: Assistants V2 (sync) -------------
 
-    def _ensure_thread(self, session_id: Optional[str]) -> str:
-        sid = session_id or "default"
-        tid = self._threads.get(sid)
+    def _ensure_thread(self, session_id: str, scope: str) -> str:
+        if self.thread_pool:
+            return self.thread_pool.thread_for(session_id, scope)
+        tid = self._threads.get((scope, session_id))
         if tid:
             return tid
         t = self.client.beta.threads.create()
-        self._threads[sid] = t.id
+        self._threads[(scope, session_id)] = t.id
         return t.id
 
     def _assistant_reply_sync(
@@ -113,12 +303,17 @@ class OpenAIClient(GPTClient):
         stream: bool,
         session_id: Optional[str],
         context_text: Optional[str],
+        stop: Optional[threading.Event] = None,
+        scope: str = "",
     ) -> Tuple[str, Dict, Optional[str]]:
         """
-        - Ensures a thread per session_id.
+        - Uses the thread of (scope, session_id); sessionless calls get a throwaway thread
+          that is deleted after the run, so unrelated callers never share context.
         - Appends the latest user turn (optionally with ephemeral context) to the thread.
         - Creates a run addressed to your assistant and polls until completion.
         - Returns the assistant text.
+        - If `stop` is set while polling, cancels the run, waits for it to end and removes the
+          user message (and any partial reply) from the thread.
         """
         # Take the latest user message; Assistants keep the history in the thread.
         user_text = ""
@@ -134,10 +329,32 @@ class OpenAIClient(GPTClient):
                 f"User request:\n{user_text}"
             )
 
-        thread_id = self._ensure_thread(session_id)
+        if session_id:
+            return self._run_on_thread(self._ensure_thread(session_id, scope), user_text, stop)
 
+        if self.thread_pool:
+            thread_id = self.thread_pool.acquire()
+        else:
+            thread_id = self.client.beta.threads.create().id
+        try:
+            return self._run_on_thread(thread_id, user_text, stop)
+        finally:
+            if self.thread_pool:
+                self.thread_pool.release(thread_id)
+            else:
+                try:
+                    self.client.beta.threads.delete(thread_id)
+                except Exception:
+                    log.warning("Assistant thread delete failed thread_id=%s", thread_id)
+
+    def _run_on_thread(
+        self,
+        thread_id: str,
+        user_text: str,
+        stop: Optional[threading.Event],
+    ) -> Tuple[str, Dict, Optional[str]]:
         # 1) Add message to the thread
-        self.client.beta.threads.messages.create(
+        user_msg = self.client.beta.threads.messages.create(
             thread_id=thread_id,
             role="user",
             content=user_text,
@@ -153,12 +370,24 @@ class OpenAIClient(GPTClient):
         )
 
         # 3) Poll until the run completes (simple polling loop)
+        cancel_sent = False
         while True:
             r = self.client.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run.id)
             if r.status in {"completed", "failed", "cancelled", "expired"}:
                 break
+            if stop is not None and stop.is_set() and not cancel_sent:
+                try:
+                    self.client.beta.threads.runs.cancel(thread_id=thread_id, run_id=run.id)
+                except Exception:
+                    log.warning("Assistant run cancel failed run_id=%s", run.id)
+                cancel_sent = True
             time.sleep(0.4)
 
+        if cancel_sent:
+            # Cancelled by the caller: remove this turn so the thread matches what the user saw
+            self._drop_turn(thread_id, user_msg.id, run.id)
+            return "", {"status": "cancelled"}, self.model
+
         if r.status != "completed":
             log.warning("Assistant run ended with status=%s", r.status)
             return f"Assistant error: {r.status}", {"status": r.status}, self.model
@@ -185,6 +414,15 @@ class OpenAIClient(GPTClient):
         usage = {"status": "ok", "source": "assistants_v2"}
         return text_out, usage, self.model
 
+    def _drop_turn(self, thread_id: str, user_message_id: str, run_id: str) -> None:
+        try:
+            produced = self.client.beta.threads.messages.list(thread_id=thread_id, run_id=run_id)
+            for m in produced.data:
+                self.client.beta.threads.messages.delete(m.id, thread_id=thread_id)
+            self.client.beta.threads.messages.delete(user_message_id, thread_id=thread_id)
+        except Exception:
+            log.warning("Assistant turn cleanup failed thread_id=%s run_id=%s", thread_id, run_id)
+
     # ------------- Internals: Chat Completions (sync) -------------
 
     def _chat_reply_sync(
@@ -201,9 +439,11 @@ class OpenAIClient(GPTClient):
             max_tokens=max_tokens,
         )
         content = resp.choices[0].message.content
+        # resp.usage is a CompletionUsage model (or None), not a dict
+        u = getattr(resp, "usage", None)
         usage = {
-            "prompt_tokens": getattr(resp, "usage", {}).get("prompt_tokens", None) if hasattr(resp, "usage") else None,
-            "completion_tokens": getattr(resp, "usage", {}).get("completion_tokens", None) if hasattr(resp, "usage") else None,
-            "total_tokens": getattr(resp, "usage", {}).get("total_tokens", None) if hasattr(resp, "usage") else None,
+            "prompt_tokens": getattr(u, "prompt_tokens", None),
+            "completion_tokens": getattr(u, "completion_tokens", None),
+            "total_tokens": getattr(u, "total_tokens", None),
         }
         return content, usage, self.model
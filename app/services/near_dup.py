@@ -0,0 +1,240 @@
+# app/services/near_dup.py
+"""
+Near-duplicate reuse index for reviewed texts.
+
+- Normalizes and shingles the submitted text
+- Computes MinHash signatures and buckets them with LSH (banding) in memory
+- Optionally mirrors entries to Redis (via Cache) so other workers can reuse them
+- When estimated similarity >= threshold, the previous review is returned instead of calling the model
+- Entries are partitioned by `scope` (a hash of the caller's API key) so reviews never cross callers
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+from .cache import Cache
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+_DIGITS = re.compile(r"\d+")
+_SPACES = re.compile(r"\s+")
+
+
+# ---------- Text helpers ----------
+
+def normalize(text: str) -> str:
+    """Lowercase, mask digits (dates/amounts), drop punctuation and collapse whitespace."""
+    text = text.lower()
+    text = _DIGITS.sub("0", text)
+    text = _NON_WORD.sub(" ", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def shingles(text: str, k: int = 5) -> Set[str]:
+    """Word k-shingles of the normalized text (falls back to the whole text when short)."""
+    words = normalize(text).split()
+    if not words:
+        return set()
+    if len(words) <= k:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def _hash32(s: str) -> int:
+    return int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), "big")
+
+
+# ---------- MinHash / LSH ----------
+
+class NearDupIndex:
+    """
+    In-memory MinHash/LSH index: signature of `num_perm` slots split into `bands` bands.
+    Entries are kept in insertion order and evicted FIFO once `max_entries` is reached.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        num_perm: int = 128,
+        bands: int = 32,
+        shingle_size: int = 5,
+        max_entries: int = 5000,
+        cache: Optional[Cache] = None,
+        ttl: int = 86400,
+        seed: int = 1,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.max_entries = max_entries
+        self.cache = cache if (cache and cache.available()) else None
+        self.ttl = ttl
+
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[List[int], str, Optional[str], str]]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, str], Set[str]] = {}
+
+        # metrics
+        self._lookups = 0
+        self._hits = 0
+        self._lookup_ms_total = 0.0
+        self._lookup_ms_max = 0.0
+
+    # ------------- Signatures -------------
+
+    def signature(self, text: str) -> List[int]:
+        hashes = [_hash32(s) for s in shingles(text, self.shingle_size)]
+        if not hashes:
+            return [_MAX_HASH] * self.num_perm
+        return [
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._perms
+        ]
+
+    def _band_keys(self, sig: List[int], scope: str = "") -> List[Tuple[int, str]]:
+        keys = []
+        for i in range(self.bands):
+            chunk = sig[i * self.rows:(i + 1) * self.rows]
+            raw = scope + ":" + ",".join(map(str, chunk))
+            digest = hashlib.blake2b(raw.encode(), digest_size=8).hexdigest()
+            keys.append((i, digest))
+        return keys
+
+    @staticmethod
+    def similarity(a: List[int], b: List[int]) -> float:
+        """Estimated Jaccard similarity of two signatures."""
+        if not a or len(a) != len(b):
+            return 0.0
+        return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+    # ------------- Public -------------
+
+    def lookup(self, text: str, scope: str = "") -> Tuple[Optional[Dict], List[int]]:
+        """Return ({"content", "model", "similarity"} or None, signature) for the best match above
+        threshold within `scope`. Pass the signature on to `add` so it is computed only once."""
+        t0 = time.perf_counter()
+        sig = self.signature(text)
+        keys = self._band_keys(sig, scope)
+
+        with self._lock:
+            candidates: Dict[str, Tuple[List[int], str, Optional[str]]] = {}
+            for key in keys:
+                for eid in self._buckets.get(key, ()):
+                    candidates[eid] = self._entries[eid][:3]
+
+        if self.cache and not candidates:
+            candidates.update(self._remote_candidates(keys))
+
+        best: Optional[Dict] = None
+        for other_sig, content, model in candidates.values():
+            score = self.similarity(sig, other_sig)
+            if score >= self.threshold and (best is None or score > best["similarity"]):
+                best = {"content": content, "model": model, "similarity": round(score, 4)}
+
+        elapsed = (time.perf_counter() - t0) * 1000
+        with self._lock:
+            self._lookups += 1
+            self._hits += 1 if best else 0
+            self._lookup_ms_total += elapsed
+            self._lookup_ms_max = max(self._lookup_ms_max, elapsed)
+        return best, sig
+
+    def add(
+        self,
+        text: str,
+        content: str,
+        model: Optional[str] = None,
+        scope: str = "",
+        sig: Optional[List[int]] = None,
+    ) -> str:
+        """Index a reviewed text with its model output within `scope`; returns the entry id.
+        `sig` is the signature returned by `lookup` for the same text (computed if omitted)."""
+        sig = sig if sig is not None else self.signature(text)
+        keys = self._band_keys(sig, scope)
+        eid = hashlib.sha256(f"{scope}\x00{normalize(text)}".encode()).hexdigest()[:16]
+
+        with self._lock:
+            if eid in self._entries:
+                self._drop(eid)
+            self._entries[eid] = (sig, content, model, scope)
+            for key in keys:
+                self._buckets.setdefault(key, set()).add(eid)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+        if self.cache:
+            try:
+                self.cache.set(
+                    f"near_dup:entry:{eid}",
+                    json.dumps({"sig": sig, "content": content, "model": model}),
+                    ttl=self.ttl,
+                )
+                for band, digest in keys:
+                    self.cache.set(f"near_dup:band:{band}:{digest}", eid, ttl=self.ttl)
+            except Exception:
+                pass  # persistence is best effort
+        return eid
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._lookups
+            return {
+                "entries": len(self._entries),
+                "lookups": lookups,
+                "hits": self._hits,
+                "reuse_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "lookup_ms_avg": round(self._lookup_ms_total / lookups, 3) if lookups else 0.0,
+                "lookup_ms_max": round(self._lookup_ms_max, 3),
+                "threshold": self.threshold,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    # ------------- Internals -------------
+
+    def _drop(self, eid: str) -> None:
+        sig, _, _, scope = self._entries.pop(eid)
+        for key in self._band_keys(sig, scope):
+            ids = self._buckets.get(key)
+            if ids:
+                ids.discard(eid)
+                if not ids:
+                    del self._buckets[key]
+
+    def _remote_candidates(self, keys: List[Tuple[int, str]]) -> Dict[str, Tuple[List[int], str, Optional[str]]]:
+        out: Dict[str, Tuple[List[int], str, Optional[str]]] = {}
+        try:
+            for band, digest in keys:
+                eid = self.cache.get(f"near_dup:band:{band}:{digest}")
+                if not eid or eid in out:
+                    continue
+                raw = self.cache.get(f"near_dup:entry:{eid}")
+                if raw:
+                    data = json.loads(raw)
+                    out[eid] = (data["sig"], data["content"], data.get("model"))
+        except Exception:
+            return {}
+        return out
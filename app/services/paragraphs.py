@@ -0,0 +1,83 @@
+# app/services/paragraphs.py
+"""
+Paragraph-level hashing and results store for incremental re-review.
+
+- Splits documents on blank lines and hashes each paragraph (whitespace-insensitive)
+- Keeps per-paragraph model findings in memory (LRU), optionally mirrored to Redis
+- Lets /v1/generate send only new or modified paragraphs to the model
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from .cache import Cache
+
+_BLANK_LINES = re.compile(r"\n\s*\n")
+_SPACES = re.compile(r"\s+")
+
+
+def split_paragraphs(text: str) -> List[str]:
+    """Split on blank lines; drop empty chunks."""
+    text = (text or "").replace("\r\n", "\n")
+    return [p.strip() for p in _BLANK_LINES.split(text) if p.strip()]
+
+
+def paragraph_hash(paragraph: str, scope: str = "") -> str:
+    """Content hash of a paragraph; `scope` separates results for different instructions."""
+    norm = _SPACES.sub(" ", paragraph).strip()
+    return hashlib.sha256(f"{scope}\x00{norm}".encode()).hexdigest()
+
+
+def hash_document(text: str, scope: str = "") -> List[Tuple[str, str]]:
+    """Return [(hash, paragraph)] in document order."""
+    return [(paragraph_hash(p, scope), p) for p in split_paragraphs(text)]
+
+
+class ParagraphStore:
+    """Per-paragraph findings keyed by paragraph hash (LRU in memory, optional Redis mirror)."""
+
+    def __init__(self, max_entries: int = 20000, cache: Optional[Cache] = None, ttl: int = 86400):
+        self.max_entries = max_entries
+        self.cache = cache if (cache and cache.available()) else None
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._results: "OrderedDict[str, str]" = OrderedDict()
+
+    def get(self, h: str) -> Optional[str]:
+        with self._lock:
+            val = self._results.get(h)
+            if val is not None:
+                self._results.move_to_end(h)
+                return val
+        if self.cache:
+            try:
+                val = self.cache.get(f"para:{h}")
+            except Exception:
+                val = None
+            if val is not None:
+                self._put_local(h, val)
+            return val
+        return None
+
+    def set(self, h: str, findings: str) -> None:
+        self._put_local(h, findings)
+        if self.cache:
+            try:
+                self.cache.set(f"para:{h}", findings, ttl=self.ttl)
+            except Exception:
+                pass  # persistence is best effort
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def _put_local(self, h: str, findings: str) -> None:
+        with self._lock:
+            self._results[h] = findings
+            self._results.move_to_end(h)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
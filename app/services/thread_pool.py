@@ -0,0 +1,213 @@
+# app/services/thread_pool.py
+"""
+Pre-warmed pool of Assistants threads.
+
+- Keeps empty threads pre-created so a new session skips `beta.threads.create()` on the request path
+- Refills in a background worker; target size follows the observed new-session rate
+- Owns the (scope, session_id) -> thread_id map and deletes threads idle for longer than the TTL
+- Hands out throwaway threads for sessionless requests and deletes them once released
+- Deletes all of its threads (pre-warmed, session and unreleased throwaway) on close
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Set, Tuple
+
+from openai import OpenAI
+
+log = logging.getLogger("app.thread_pool")
+
+
+class AssistantThreadPool:
+    def __init__(
+        self,
+        client: OpenAI,
+        min_size: int = 2,
+        max_size: int = 20,
+        idle_ttl_s: float = 3600.0,
+        rate_window_s: float = 60.0,
+        interval_s: float = 5.0,
+    ):
+        self.client = client
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_ttl_s = idle_ttl_s
+        self.rate_window_s = rate_window_s
+        self.interval_s = interval_s
+
+        self._lock = threading.Lock()
+        self._ready: Deque[Tuple[str, float]] = deque()  # (thread_id, created_at)
+        self._sessions: Dict[Tuple[str, str], Tuple[str, float]] = {}  # (scope, session_id) -> (thread_id, last_used)
+        self._leased: Set[str] = set()  # throwaway threads handed out by acquire()
+        self._released: Deque[str] = deque()  # throwaway threads waiting for deletion
+        self._new_sessions: Deque[float] = deque()  # timestamps of thread hand-outs
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+        # metrics
+        self.hits = 0
+        self.misses = 0
+
+    # ------------- Public -------------
+
+    def thread_for(self, session_id: str, scope: str = "") -> str:
+        """Return the thread of (scope, session_id), handing out a pre-warmed one for new sessions."""
+        self.start()
+        key = (scope, session_id)
+        now = time.monotonic()
+        with self._lock:
+            known = self._sessions.get(key)
+            if known:
+                self._sessions[key] = (known[0], now)
+                return known[0]
+            tid = self._take_ready(now)
+            if tid:
+                self._sessions[key] = (tid, now)
+
+        self._wake.set()  # refill in the background
+        if tid:
+            return tid
+
+        # Pool empty: pay the round-trip on the request path
+        tid = self.client.beta.threads.create().id
+        with self._lock:
+            self.misses += 1
+            existing = self._sessions.setdefault(key, (tid, now))
+        if existing[0] != tid:  # another request for the same session won the race
+            self._delete(tid)
+        return existing[0]
+
+    def acquire(self) -> str:
+        """Hand out a throwaway thread for a sessionless request; give it back with `release`."""
+        self.start()
+        with self._lock:
+            tid = self._take_ready(time.monotonic())
+            if tid:
+                self._leased.add(tid)
+        self._wake.set()
+        if tid:
+            return tid
+        tid = self.client.beta.threads.create().id
+        with self._lock:
+            self.misses += 1
+            self._leased.add(tid)
+        return tid
+
+    def release(self, thread_id: str) -> None:
+        """Queue a throwaway thread for deletion by the background worker."""
+        with self._lock:
+            self._leased.discard(thread_id)
+            self._released.append(thread_id)
+        self._wake.set()
+
+    def target_size(self) -> int:
+        """New sessions seen in the last `rate_window_s`, clamped to [min_size, max_size]."""
+        cutoff = time.monotonic() - self.rate_window_s
+        with self._lock:
+            while self._new_sessions and self._new_sessions[0] < cutoff:
+                self._new_sessions.popleft()
+            return max(self.min_size, min(self.max_size, len(self._new_sessions)))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "ready": len(self._ready),
+                "sessions": len(self._sessions),
+                "leased": len(self._leased),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def close(self) -> None:
+        """
+        Stop the worker and delete every thread this process owns: unused pre-warmed, session and
+        throwaway threads (the maps die with the process, so nothing could reap them later).
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._worker is not None and self._worker is not threading.current_thread():
+            self._worker.join(timeout=self.interval_s)
+        with self._lock:
+            doomed = [tid for tid, _ in self._ready] + [tid for tid, _ in self._sessions.values()]
+            doomed += list(self._leased) + list(self._released)
+            self._ready.clear()
+            self._sessions.clear()
+            self._leased.clear()
+            self._released.clear()
+        for tid in doomed:
+            self._delete(tid)
+        if doomed:
+            log.info("thread_pool_closed deleted=%s", len(doomed))
+
+    # ------------- Background worker -------------
+
+    def start(self) -> None:
+        """Start the refill/reaper worker (idempotent)."""
+        if self._worker is None or not self._worker.is_alive():
+            with self._lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._stop.clear()
+                    self._worker = threading.Thread(target=self._run, name="assistant-thread-pool", daemon=True)
+                    self._worker.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._refill()
+                self._reap()
+            except Exception:
+                log.exception("thread_pool_maintenance_failed")
+            self._wake.wait(self.interval_s)
+            self._wake.clear()
+
+    def _refill(self) -> None:
+        target = self.target_size()
+        while not self._stop.is_set():
+            with self._lock:
+                missing = target - len(self._ready)
+            if missing <= 0:
+                return
+            tid = self.client.beta.threads.create().id
+            if self._stop.is_set():  # closed while creating
+                self._delete(tid)
+                return
+            with self._lock:
+                self._ready.append((tid, time.monotonic()))
+
+    def _reap(self) -> None:
+        """Delete released throwaway threads, session threads idle past the TTL and surplus/stale
+        pre-warmed threads."""
+        now = time.monotonic()
+        target = self.target_size()
+        with self._lock:
+            doomed = list(self._released)
+            self._released.clear()
+            for sid, (tid, last_used) in list(self._sessions.items()):
+                if now - last_used > self.idle_ttl_s:
+                    del self._sessions[sid]
+                    doomed.append(tid)
+            while len(self._ready) > target or (self._ready and now - self._ready[0][1] > self.idle_ttl_s):
+                doomed.append(self._ready.popleft()[0])
+        for tid in doomed:
+            self._delete(tid)
+        if doomed:
+            log.info("thread_pool_reaped count=%s", len(doomed))
+
+    def _take_ready(self, now: float) -> Optional[str]:
+        """Pop a pre-warmed thread (caller holds the lock); every hand-out counts toward the rate."""
+        self._new_sessions.append(now)
+        if not self._ready:
+            return None
+        self.hits += 1
+        return self._ready.popleft()[0]
+
+    def _delete(self, tid: str) -> None:
+        try:
+            self.client.beta.threads.delete(tid)
+        except Exception:
+            log.warning("thread_delete_failed thread_id=%s", tid)
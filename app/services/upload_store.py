@@ -0,0 +1,74 @@
+# app/services/upload_store.py
+"""
+Ephemeral per-session upload text, kept in memory only.
+
+- Keyed by (API key scope, session_id) so one caller can never read another caller's upload
+- Bounded: LRU eviction past `max_sessions` or `max_total_chars`, entries expire after `ttl_s`
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+class UploadStore:
+    def __init__(self, max_sessions: int = 500, max_total_chars: int = 50_000_000, ttl_s: float = 3600.0):
+        self.max_sessions = max_sessions
+        self.max_total_chars = max_total_chars
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[Tuple[str, str], Tuple[str, float]]" = OrderedDict()  # -> (text, stored_at)
+        self._chars = 0
+
+    def get(self, scope: str, session_id: Optional[str]) -> Optional[str]:
+        if not session_id:
+            return None
+        key = (scope, session_id)
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            if time.monotonic() - item[1] > self.ttl_s:
+                self._pop(key)
+                return None
+            self._items.move_to_end(key)
+            return item[0]
+
+    def set(self, scope: str, session_id: str, text: str) -> None:
+        key = (scope, session_id)
+        with self._lock:
+            if key in self._items:
+                self._pop(key)
+            self._items[key] = (text, time.monotonic())
+            self._chars += len(text)
+            self._evict()
+
+    def delete(self, scope: str, session_id: str) -> None:
+        with self._lock:
+            if (scope, session_id) in self._items:
+                self._pop((scope, session_id))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"sessions": len(self._items), "chars": self._chars}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _pop(self, key: Tuple[str, str]) -> None:
+        text, _ = self._items.pop(key)
+        self._chars -= len(text)
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        for key, (_, stored_at) in list(self._items.items()):
+            if now - stored_at > self.ttl_s:
+                self._pop(key)
+        # keep the newest entry even if it alone exceeds the char budget
+        while len(self._items) > 1 and (
+            len(self._items) > self.max_sessions or self._chars > self.max_total_chars
+        ):
+            self._pop(next(iter(self._items)))
@@ -1,3 +1,4 @@
+import hashlib
 from fastapi import Header, HTTPException, status
 from typing import Optional
 from ..config import settings
@@ -6,3 +7,15 @@ async def api_key_auth(x_api_key: Optional[str] = Header(default=None)) -> str:
     if not x_api_key or x_api_key not in settings.API_KEYS:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or missing API key")
     return x_api_key
+
+async def admin_key_auth(x_admin_key: Optional[str] = Header(default=None)) -> str:
+    if not settings.ADMIN_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_admin_key or x_admin_key not in settings.ADMIN_API_KEYS:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or missing admin key")
+    return x_admin_key
+
+
+def key_scope(api_key: str) -> str:
+    """Stable, non-reversible id for an API key, used to partition per-caller state."""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
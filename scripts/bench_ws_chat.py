@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+Messages/sec for one client: HTTP POST /v1/generate vs one /v1/ws/chat connection.
+
+Runs in-process against the app (no network), so it measures per-message framework
+overhead (CORS, auth, validation, client setup) rather than upstream latency.
+Use GPT_PROVIDER=echo (default) for comparable numbers.
+
+    python scripts/bench_ws_chat.py --messages 500
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+def bench_http(client: TestClient, n: int, api_key: str) -> float:
+    headers = {"X-API-Key": api_key}
+    history = []
+    t0 = time.perf_counter()
+    for i in range(n):
+        history.append({"role": "user", "content": f"message {i}"})
+        r = client.post("/v1/generate", headers=headers, json={"messages": history})
+        r.raise_for_status()
+        history.append({"role": "assistant", "content": r.json()["content"]})
+    return n / (time.perf_counter() - t0)
+
+
+def bench_ws(client: TestClient, n: int, api_key: str) -> float:
+    with client.websocket_connect("/v1/ws/chat", headers={"X-API-Key": api_key}) as ws:
+        ws.receive_json()  # ready
+        t0 = time.perf_counter()
+        for i in range(n):
+            ws.send_json({"type": "message", "id": str(i), "content": f"message {i}"})
+            while ws.receive_json()["type"] != "done":
+                pass
+        return n / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=200)
+    args = parser.parse_args()
+
+    api_key = settings.API_KEYS[0]
+    client = TestClient(app)
+    http = bench_http(client, args.messages, api_key)
+    ws = bench_ws(client, args.messages, api_key)
+    print(f"provider={settings.GPT_PROVIDER} messages={args.messages}")
+    print(f"http  {http:8.1f} msg/s")
+    print(f"ws    {ws:8.1f} msg/s  ({ws / http:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
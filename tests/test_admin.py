@@ -0,0 +1,49 @@
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.main import app
+
+headers = {"X-Admin-Key": "admin-key"}
+
+
+def test_admin_disabled_by_default():
+    client = TestClient(app)
+    r = client.get("/v1/admin/runtime", headers=headers)
+    assert r.status_code == 404
+
+
+def test_admin_endpoints(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_ENABLED", True)
+    monkeypatch.setattr(settings, "ADMIN_API_KEYS", ["admin-key"])
+    client = TestClient(app)
+
+    assert client.get("/v1/admin/runtime", headers={"X-Admin-Key": "dev-secret-key"}).status_code == 401
+    r = client.get("/v1/admin/runtime", headers=headers)
+    assert r.status_code == 200 and "executor" in r.json()
+
+    r = client.post("/v1/admin/profile/cpu?seconds=0.2&format=speedscope", headers=headers)
+    assert r.status_code == 200
+    assert r.json()["profiles"][0]["type"] == "sampled"
+
+    assert client.post("/v1/admin/memory/start", headers=headers).status_code == 200
+    first = client.get("/v1/admin/memory/snapshot?limit=5", headers=headers).json()
+    second = client.get("/v1/admin/memory/snapshot?limit=5", headers=headers).json()
+    assert first["diff"] is None and second["diff"] is not None
+    assert "session_uploads" in second["stores"]
+    assert client.post("/v1/admin/memory/stop", headers=headers).status_code == 200
+
+
+def test_debug_profile_uses_separate_admin_header(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_ENABLED", True)
+    monkeypatch.setattr(settings, "ADMIN_API_KEYS", ["admin-key"])
+    client = TestClient(app)
+    r = client.post(
+        "/v1/generate",
+        headers={"X-API-Key": "dev-secret-key", "X-Admin-Key": "admin-key", "X-Debug-Profile": "1"},
+        json={"messages": [{"role": "user", "content": "hi"}]},
+    )
+    assert r.status_code == 200
+    profile_id = r.headers["X-Profile-ID"]
+    p = client.get(f"/v1/admin/profile/requests/{profile_id}", headers=headers)
+    assert p.status_code == 200 and p.json()["profiles"][0]["type"] == "sampled"
+    names = {f["name"] for f in p.json()["shared"]["frames"]}
+    assert "thread:assistant-thread-pool" not in names and "thread:stack-sampler" not in names
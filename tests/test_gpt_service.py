@@ -0,0 +1,62 @@
+import asyncio
+from types import SimpleNamespace
+
+from openai.types import CompletionUsage
+
+from app.services import gpt_service
+from app.services.gpt_service import OpenAIClient
+
+
+def test_review_reads_completion_usage_model(monkeypatch):
+    seen = {}
+
+    def create(**kwargs):
+        seen.update(kwargs)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="looks fine"))],
+            usage=CompletionUsage(prompt_tokens=11, completion_tokens=3, total_tokens=14),
+        )
+
+    monkeypatch.setattr(gpt_service, "OpenAI", lambda api_key: None)
+    client = OpenAIClient(api_key="sk-test", model="gpt-test", assistant_id="asst_test")
+    client.client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create)),
+        beta=SimpleNamespace(assistants=SimpleNamespace(
+            retrieve=lambda _id: SimpleNamespace(instructions="You are Inya."),
+        )),
+    )
+    content, usage, model = asyncio.run(client.review("The chairman said hi."))
+    assert content == "looks fine" and model == "gpt-test"
+    assert usage == {"prompt_tokens": 11, "completion_tokens": 3, "total_tokens": 14}
+    assert seen["messages"][0] == {"role": "system", "content": "You are Inya."}
+
+
+def test_cancelled_assistant_run_removes_turn_from_thread(monkeypatch):
+    import threading
+
+    deleted = []
+    stop = threading.Event()
+    stop.set()
+
+    messages = SimpleNamespace(
+        create=lambda **kw: SimpleNamespace(id="msg_user"),
+        list=lambda thread_id, run_id: SimpleNamespace(data=[SimpleNamespace(id="msg_partial")]),
+        delete=lambda message_id, thread_id: deleted.append(message_id),
+    )
+    runs = SimpleNamespace(
+        create=lambda **kw: SimpleNamespace(id="run_1"),
+        retrieve=lambda thread_id, run_id: SimpleNamespace(status="cancelled" if runs.cancelled else "in_progress"),
+        cancel=lambda thread_id, run_id: setattr(runs, "cancelled", True),
+        cancelled=False,
+    )
+    monkeypatch.setattr(gpt_service, "OpenAI", lambda api_key: None)
+    monkeypatch.setattr(gpt_service.time, "sleep", lambda s: None)
+    client = OpenAIClient(api_key="sk-test", model="gpt-test", assistant_id="asst_test")
+    client.client = SimpleNamespace(beta=SimpleNamespace(threads=SimpleNamespace(
+        create=lambda: SimpleNamespace(id="thread_1"), messages=messages, runs=runs,
+    )))
+    text, usage, _ = client._assistant_reply_sync(
+        [{"role": "user", "content": "hi"}], 0.6, 100, False, session_id="s1", context_text=None, stop=stop,
+    )
+    assert text == "" and usage == {"status": "cancelled"}
+    assert deleted == ["msg_partial", "msg_user"]
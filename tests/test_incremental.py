@@ -0,0 +1,37 @@
+from fastapi.testclient import TestClient
+from app.main import app
+
+headers = {"X-API-Key": "dev-secret-key"}
+
+DOC = "First paragraph about the chairman.\n\nSecond paragraph about manpower.\n\nThird paragraph."
+
+
+def test_incremental_reviews_only_changed_paragraphs():
+    client = TestClient(app)
+    body = {"messages": [{"role": "user", "content": DOC}], "incremental": True}
+    first = client.post("/v1/generate", headers=headers, json=body)
+    assert first.status_code == 200
+    assert first.json()["usage"]["reviewed_paragraphs"] == 3
+
+    body["messages"][0]["content"] = DOC.replace("manpower", "workforce")
+    second = client.post("/v1/generate", headers=headers, json=body)
+    assert second.status_code == 200
+    usage = second.json()["usage"]
+    assert usage["reviewed_paragraphs"] == 1 and usage["reused_paragraphs"] == 2
+    assert "workforce" in second.json()["content"]
+
+
+def test_incremental_long_document_is_not_short_circuited():
+    client = TestClient(app)
+    paragraphs = [f"Paragraph {i}: our chairman expects every salesman to meet quota." for i in range(20)]
+    body = {"messages": [{"role": "user", "content": "\n\n".join(paragraphs)}], "incremental": True}
+    assert len(body["messages"][0]["content"]) > 200
+    assert client.post("/v1/generate", headers=headers, json=body).status_code == 200
+
+    paragraphs[7] = "Paragraph 7: our chairperson expects every salesperson to meet quota."
+    body["messages"][0]["content"] = "\n\n".join(paragraphs)
+    r = client.post("/v1/generate", headers=headers, json=body)
+    usage = r.json()["usage"]
+    assert usage.get("status") != "reused"
+    assert usage["reviewed_paragraphs"] == 1 and usage["reused_paragraphs"] == 19
+    assert "chairperson" in r.json()["content"]
@@ -0,0 +1,103 @@
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.near_dup import NearDupIndex
+
+headers = {"X-API-Key": "dev-secret-key"}
+
+AD = (
+    "We are hiring a rockstar developer to join our young and energetic team. "
+    "The ideal candidate is a native English speaker who can hit the ground running. "
+    "He will own our backend services and report to the CTO. Apply before 12 March 2024 "
+    "by emailing jobs@example.com with your CV and a short cover letter."
+)
+
+
+def test_near_duplicate_is_reused():
+    index = NearDupIndex(threshold=0.7)
+    index.add(AD, "review-1", "m")
+    edited = AD.replace("12 March 2024", "3 April 2025").replace("  ", " ")
+    hit, _ = index.lookup(edited)
+    assert hit is not None and hit["content"] == "review-1"
+    assert index.lookup("Completely unrelated text about the weather in spring and gardening tips.")[0] is None
+    stats = index.stats()
+    assert stats["lookups"] == 2 and stats["hits"] == 1 and stats["reuse_rate"] == 0.5
+
+
+def test_generate_reuses_previous_review():
+    client = TestClient(app)
+    body = {"messages": [{"role": "user", "content": AD}]}
+    first = client.post("/v1/generate", headers=headers, json=body)
+    assert first.status_code == 200
+    body["messages"][0]["content"] = AD.replace("2024", "2026")
+    second = client.post("/v1/generate", headers=headers, json=body)
+    assert second.status_code == 200
+    assert second.json()["content"] == first.json()["content"]
+    assert second.json()["usage"]["status"] == "reused"
+
+
+def test_near_dup_is_scoped():
+    index = NearDupIndex(threshold=0.7)
+    index.add(AD, "review-1", "m", scope="caller-a")
+    assert index.lookup(AD, scope="caller-b")[0] is None
+    assert index.lookup(AD, scope="caller-a")[0]["content"] == "review-1"
+
+
+def test_questions_about_one_upload_both_reach_model():
+    from app.deps import get_gpt_client
+    from app.routes.v1.docs import SESSION_UPLOADS
+    from app.services.gpt_service import EchoClient
+
+    calls = []
+
+    class CountingClient(EchoClient):
+        async def generate(self, messages, *args, **kwargs):
+            calls.append(messages[-1]["content"])
+            return await super().generate(messages, *args, **kwargs)
+
+    from app.utils.auth import key_scope
+
+    SESSION_UPLOADS.set(key_scope("dev-secret-key"), "nd-upload", AD * 20)
+    app.dependency_overrides[get_gpt_client] = CountingClient
+    try:
+        client = TestClient(app)
+        for question in ("Is the word 'rockstar' inclusive? " * 8, "Please rewrite the second section. " * 8):
+            body = {"messages": [{"role": "user", "content": question}], "session_id": "nd-upload"}
+            r = client.post("/v1/generate", headers=headers, json=body)
+            assert r.status_code == 200
+            assert r.json()["usage"].get("status") != "reused"
+    finally:
+        app.dependency_overrides.clear()
+        SESSION_UPLOADS.delete(key_scope("dev-secret-key"), "nd-upload")
+    assert len(calls) == 2
+
+
+def test_lookup_signature_is_reused_by_add():
+    index = NearDupIndex(threshold=0.7)
+    hit, sig = index.lookup(AD)
+    assert hit is None and sig == index.signature(AD)
+    index.add(AD, "review-1", "m", sig=sig)
+    assert index.lookup(AD)[0]["content"] == "review-1"
+
+
+def test_different_system_prompts_do_not_share_replies():
+    from app.deps import get_gpt_client
+    from app.services.gpt_service import EchoClient
+
+    calls = []
+
+    class CountingClient(EchoClient):
+        async def generate(self, messages, *args, **kwargs):
+            calls.append(messages[0]["content"])
+            return await super().generate(messages, *args, **kwargs)
+
+    app.dependency_overrides[get_gpt_client] = CountingClient
+    try:
+        client = TestClient(app)
+        for system in ("Translate the text into French.", "Review the text for inclusive language."):
+            body = {"messages": [{"role": "system", "content": system}, {"role": "user", "content": AD + " sys"}]}
+            r = client.post("/v1/generate", headers=headers, json=body)
+            assert r.status_code == 200
+            assert r.json()["usage"].get("status") != "reused"
+    finally:
+        app.dependency_overrides.clear()
+    assert len(calls) == 2
@@ -0,0 +1,94 @@
+import itertools
+import time
+from types import SimpleNamespace
+
+from app.services.thread_pool import AssistantThreadPool
+
+
+class FakeThreads:
+    def __init__(self):
+        self._ids = itertools.count()
+        self.deleted = []
+
+    def create(self):
+        return SimpleNamespace(id=f"thread_{next(self._ids)}")
+
+    def delete(self, tid):
+        self.deleted.append(tid)
+
+
+def fake_client():
+    return SimpleNamespace(beta=SimpleNamespace(threads=FakeThreads()))
+
+
+def wait_for(cond, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not cond() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return cond()
+
+
+def test_new_session_gets_prewarmed_thread():
+    pool = AssistantThreadPool(fake_client(), min_size=2, interval_s=0.05)
+    pool.start()
+    assert wait_for(lambda: pool.stats()["ready"] == 2)
+    tid = pool.thread_for("s1")
+    assert pool.thread_for("s1") == tid
+    assert pool.stats()["hits"] == 1 and pool.stats()["misses"] == 0
+    pool.close()
+
+
+def test_idle_session_threads_are_deleted():
+    client = fake_client()
+    pool = AssistantThreadPool(client, min_size=0, idle_ttl_s=0.05, interval_s=0.02)
+    tid = pool.thread_for("s1")
+    assert wait_for(lambda: tid in client.beta.threads.deleted)
+    assert pool.stats()["sessions"] == 0
+    pool.close()
+
+
+def test_close_deletes_session_and_prewarmed_threads():
+    client = fake_client()
+    pool = AssistantThreadPool(client, min_size=1, interval_s=0.02)
+    pool.start()
+    assert wait_for(lambda: pool.stats()["ready"] == 1)
+    session_tid = pool.thread_for("s1")
+    assert wait_for(lambda: pool.stats()["ready"] == 1)
+    ready_tid = pool._ready[0][0]
+    pool.close()
+    assert {session_tid, ready_tid} <= set(client.beta.threads.deleted)
+    assert pool.stats()["sessions"] == 0 and pool.stats()["ready"] == 0
+
+
+def test_sessions_are_partitioned_by_key_scope():
+    pool = AssistantThreadPool(fake_client(), min_size=0, interval_s=0.05)
+    assert pool.thread_for("s1", "key-a") != pool.thread_for("s1", "key-b")
+    assert pool.thread_for("s1", "key-a") == pool.thread_for("s1", "key-a")
+    pool.close()
+
+
+def test_sessionless_requests_get_throwaway_threads(monkeypatch):
+    from app.services import gpt_service
+    from app.services.gpt_service import OpenAIClient
+
+    client = fake_client()
+    used = []
+    client.beta.threads.messages = SimpleNamespace(
+        create=lambda thread_id, **kw: used.append(thread_id) or SimpleNamespace(id="msg"),
+        list=lambda **kw: SimpleNamespace(data=[]),
+    )
+    client.beta.threads.runs = SimpleNamespace(
+        create=lambda **kw: SimpleNamespace(id="run"),
+        retrieve=lambda **kw: SimpleNamespace(status="completed"),
+    )
+    pool = AssistantThreadPool(client, min_size=2, interval_s=0.02)
+    monkeypatch.setattr(gpt_service, "OpenAI", lambda api_key: None)
+    gpt = OpenAIClient(api_key="sk-test", model="gpt-test", assistant_id="asst_test", thread_pool=pool)
+    gpt.client = client
+
+    for _ in range(2):
+        gpt._assistant_reply_sync([{"role": "user", "content": "hi"}], 0.6, 100, False, None, None)
+    assert len(used) == 2 and used[0] != used[1]
+    assert wait_for(lambda: set(used) <= set(client.beta.threads.deleted))
+    assert pool.stats()["sessions"] == 0 and pool.stats()["leased"] == 0
+    pool.close()
@@ -27,3 +27,17 @@ def test_upload_unsupported_file():
     files = {"file": ("fake.pdf", data, "application/pdf")}
     r = client.post("/v1/docs/upload", headers=headers, files=files)
     assert r.status_code in (200, 400, 502)
+
+# Test session upload keeps text in memory and reports changed paragraphs on re-upload
+def test_upload_session_reports_changed_paragraphs():
+    client = TestClient(app)
+    data = {"session_id": "upload-diff"}
+    first = io.BytesIO(b"Intro.\n\nThe chairman decides.\n\nOutro.")
+    r = client.post("/v1/docs/upload", headers=headers, files={"file": ("p.txt", first, "text/plain")}, data=data)
+    assert r.status_code == 200
+    assert r.json()["paragraphs"] == 3 and r.json()["changed_paragraphs"] == 3
+
+    second = io.BytesIO(b"Intro.\n\nThe chair decides.\n\nOutro.")
+    r = client.post("/v1/docs/upload", headers=headers, files={"file": ("p.txt", second, "text/plain")}, data=data)
+    assert r.status_code == 200
+    assert r.json()["changed_paragraphs"] == 1
@@ -0,0 +1,22 @@
+import time
+
+from app.services.upload_store import UploadStore
+
+
+def test_uploads_are_scoped_per_key():
+    store = UploadStore()
+    store.set("key-a", "s1", "secret text")
+    assert store.get("key-a", "s1") == "secret text"
+    assert store.get("key-b", "s1") is None
+
+
+def test_uploads_are_bounded_and_expire():
+    store = UploadStore(max_sessions=2, max_total_chars=10, ttl_s=0.05)
+    store.set("k", "s1", "aaaa")
+    store.set("k", "s2", "bbbb")
+    store.set("k", "s3", "cccc")  # evicts s1 (LRU)
+    assert store.get("k", "s1") is None and store.get("k", "s3") == "cccc"
+    store.set("k", "s4", "dddddddd")  # over the char budget: oldest go first
+    assert store.stats()["chars"] <= 10 and store.get("k", "s4") == "dddddddd"
+    time.sleep(0.06)
+    assert store.get("k", "s4") is None
@@ -0,0 +1,146 @@
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from app.main import app
+
+
+AUTH = {"X-API-Key": "dev-secret-key"}
+
+
+def test_ws_chat_rejects_bad_key():
+    client = TestClient(app)
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect("/v1/ws/chat", headers={"X-API-Key": "bad-key"}) as ws:
+            ws.receive_json()
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect("/v1/ws/chat") as ws:
+            ws.send_json({"type": "auth", "api_key": "bad-key"})
+            ws.receive_json()
+    # the key is never taken from the URL
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect("/v1/ws/chat?api_key=dev-secret-key") as ws:
+            ws.send_json({"type": "message", "id": "1", "content": "hi"})
+            ws.receive_json()
+
+
+def test_ws_chat_auth_frame_resumes_session_with_history():
+    from app.deps import get_gpt_client
+    from app.services.gpt_service import EchoClient
+
+    seen = []
+
+    class RecordingClient(EchoClient):
+        async def generate_stream(self, messages, *args, **kwargs):
+            seen.append([m["content"] for m in messages])
+            return await super().generate_stream(messages, *args, **kwargs)
+
+    app.dependency_overrides[get_gpt_client] = RecordingClient
+    try:
+        client = TestClient(app)
+        with client.websocket_connect("/v1/ws/chat") as ws:
+            ws.send_json({
+                "type": "auth",
+                "api_key": "dev-secret-key",
+                "session_id": "resumed",
+                "history": [{"role": "user", "content": "first"}, {"role": "assistant", "content": "[echo] first"}],
+            })
+            assert ws.receive_json() == {"type": "ready", "session_id": "resumed"}
+            ws.send_json({"type": "message", "id": "2", "content": "second"})
+            while (msg := ws.receive_json())["type"] != "done":
+                pass
+    finally:
+        app.dependency_overrides.clear()
+    assert msg["content"] == "[echo] second"
+    assert seen[-1][-3:] == ["first", "[echo] first", "second"]
+
+
+def test_ws_chat_streams_reply():
+    client = TestClient(app)
+    with client.websocket_connect("/v1/ws/chat?session_id=s1", headers=AUTH) as ws:
+        assert ws.receive_json() == {"type": "ready", "session_id": "s1"}
+        ws.send_json({"type": "message", "id": "1", "content": "Say hi"})
+        deltas = []
+        while True:
+            msg = ws.receive_json()
+            if msg["type"] == "token":
+                deltas.append(msg["delta"])
+            elif msg["type"] == "done":
+                break
+        assert msg["id"] == "1" and msg["content"] == "[echo] Say hi"
+        assert "".join(deltas) == msg["content"]
+
+
+def test_ws_chat_rejects_bad_frames_and_keeps_running():
+    client = TestClient(app)
+    with client.websocket_connect("/v1/ws/chat", headers=AUTH) as ws:
+        ws.receive_json()  # ready
+        ws.send_text("not json")
+        assert ws.receive_json()["type"] == "error"
+        ws.send_json(["not", "an", "object"])
+        assert ws.receive_json()["type"] == "error"
+        ws.send_json({"type": "message", "id": "1", "content": "hi", "temperature": "hot"})
+        assert ws.receive_json() == {
+            "type": "error", "id": "1", "detail": "temperature must be a number and max_tokens an integer",
+        }
+        ws.send_json({"type": "message", "id": "2", "content": "still here"})
+        while (msg := ws.receive_json())["type"] != "done":
+            pass
+        assert msg["id"] == "2" and msg["content"] == "[echo] still here"
+
+
+def test_ws_chat_pongs_do_not_keep_idle_socket_open(monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "WS_HEARTBEAT_S", 0.05)
+    monkeypatch.setattr(settings, "WS_IDLE_TIMEOUT_S", 0.2)
+    client = TestClient(app)
+    with client.websocket_connect("/v1/ws/chat", headers=AUTH) as ws:
+        ws.receive_json()  # ready
+        with pytest.raises(WebSocketDisconnect):
+            for _ in range(100):
+                if ws.receive_json()["type"] == "ping":
+                    ws.send_json({"type": "pong"})
+
+
+def test_ws_chat_serializes_threaded_sessions_and_skips_cancelled_turns():
+    import asyncio
+    from app.deps import get_gpt_client
+    from app.services.gpt_service import EchoClient
+
+    state = {"active": 0, "peak": 0, "seen": []}
+
+    class ThreadedClient(EchoClient):
+        threaded_sessions = True
+
+        async def generate(self, messages, *args, **kwargs):
+            state["seen"].append([m["content"] for m in messages])
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            try:
+                await asyncio.sleep(0.3 if messages[-1]["content"] == "slow" else 0.05)
+            finally:
+                state["active"] -= 1
+            return await super().generate(messages, *args, **kwargs)
+
+    app.dependency_overrides[get_gpt_client] = ThreadedClient
+    try:
+        client = TestClient(app)
+        with client.websocket_connect("/v1/ws/chat", headers=AUTH) as ws:
+            ws.receive_json()  # ready
+            ws.send_json({"type": "message", "id": "1", "content": "slow"})
+            ws.send_json({"type": "message", "id": "2", "content": "second"})
+            ws.send_json({"type": "cancel", "id": "1"})
+            results = {}
+            while len(results) < 2:
+                msg = ws.receive_json()
+                if msg["type"] in ("done", "cancelled"):
+                    results[msg["id"]] = msg["type"]
+            assert results == {"1": "cancelled", "2": "done"}
+            ws.send_json({"type": "message", "id": "3", "content": "third"})
+            while ws.receive_json()["type"] != "done":
+                pass
+    finally:
+        app.dependency_overrides.clear()
+    assert state["peak"] == 1
+    # the cancelled "slow" turn never entered the history
+    assert state["seen"][-1] == ["second", "[echo] second", "third"]